@@ -9,24 +9,143 @@ Run: python app.py
 Then open: http://localhost:5002
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from copilot import CopilotClient
+import orjson
+import requests
 import asyncio
+import collections
+import atexit
+import concurrent.futures
+import hashlib
 import re
+import sys
+import threading
 import subprocess
 import shutil
 import os
 import tempfile
 import stat
 import time
+from dataclasses import dataclass, field
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, which is much faster for large payloads."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+# Maximum time (seconds) a single analysis may take before the request fails
+ANALYSIS_TIMEOUT = 600
+
+# Single event loop shared by all requests, so the Copilot client stays bound to it.
+# It runs forever in a background thread and request threads submit coroutines to it.
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name="asyncio-loop", daemon=True).start()
+
+# Shared Copilot client - started lazily on first use and reused across requests
+_client = CopilotClient()
+_client_started = False
+_client_lock = None
+
+
+def run_async(coro, timeout: float = None):
+    """
+    Run a coroutine on the shared event loop and wait for its result.
+    
+    Safe to call from any request thread; coroutines from concurrent
+    requests run interleaved on the same loop.
+    
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling (None waits forever)
+    
+    Returns:
+        The coroutine's result
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Timed out after {timeout} seconds")
+
+
+async def get_client() -> CopilotClient:
+    """
+    Return the shared Copilot client, starting it on first use.
+    
+    Returns:
+        The started CopilotClient
+    """
+    global _client_started, _client_lock
+    if _client_lock is None:
+        _client_lock = asyncio.Lock()
+    async with _client_lock:
+        if not _client_started:
+            await _client.start()
+            _client_started = True
+    return _client
+
+
+@atexit.register
+def _stop_client():
+    """Stop the shared Copilot client when the app exits."""
+    if _client_started:
+        run_async(_client.stop(), timeout=10)
+
 # Base directory for cloned repos
 TEMP_REPOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp_repos")
 
+# Completed analyses, keyed by repo, commit SHA and analysis type
+ANALYSIS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_cache")
+
+# Maximum number of completed analyses kept on disk (least recently used are pruned)
+MAX_CACHED_ANALYSES = 200
+
+# Maximum number of cloned repos kept on disk for reuse (least recently used are evicted)
+MAX_CACHED_REPOS = 10
+
+# Single worker thread for deleting evicted clones and pruned analyses, so
+# cleanups never race each other
+_cleanup_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="repo-cleanup")
+
+# Paths materialised in the working tree - the files the analysis prompts actually read
+SPARSE_CHECKOUT_PATHS = [
+    "/README*", "/*.md",
+    "/package.json", "/requirements.txt", "/pyproject.toml", "/Cargo.toml", "/go.mod",
+    "/src", "/lib",
+]
+
+# Maximum number of tracked files listed in the analysis prompt
+MAX_LISTED_FILES = 500
+
+# Per-clone locks (so concurrent requests don't update the same folder) and
+# cached `git ls-tree` listings keyed by clone path -> (HEAD sha, files, total).
+# Entries for evicted or missing clones are dropped by evict_stale_repos.
+_repo_locks = {}
+_tree_cache = {}
+
+# Number of requests currently updating or analyzing each clone. Guarded by a
+# thread lock because evictions run on the cleanup thread: a clone is only
+# evicted if it is unused, and it is claimed (renamed away) under the same lock.
+_repos_in_use = collections.Counter()
+_repo_state_lock = threading.Lock()
+
+# Prefix for evicted clones that are waiting to be deleted
+EVICTED_PREFIX = ".evicted-"
+
 
 def remove_readonly(func, path, excinfo):
     """Error handler for shutil.rmtree to handle read-only files on Windows."""
@@ -44,17 +163,11 @@ def safe_rmtree(path: str, retries: int = 3):
     """
     for attempt in range(retries):
         try:
-            if os.path.exists(path):
-                # On Windows, try to release git locks first
-                git_dir = os.path.join(path, ".git")
-                if os.path.exists(git_dir):
-                    # Run git gc to release locks
-                    subprocess.run(
-                        ["git", "-C", path, "gc", "--prune=now"],
-                        capture_output=True,
-                        timeout=10
-                    )
-                shutil.rmtree(path, onerror=remove_readonly)
+            # Read-only files are handled by remove_readonly; transient
+            # Windows locks on pack files are handled by the retry below
+            shutil.rmtree(path, onerror=remove_readonly)
+            return True
+        except FileNotFoundError:
             return True
         except Exception as e:
             print(f"⚠️ Cleanup attempt {attempt + 1} failed: {e}")
@@ -64,6 +177,26 @@ def safe_rmtree(path: str, retries: int = 3):
     return False
 
 
+def write_block(lines: list):
+    """
+    Write a multi-line log block to stdout with a single write call.
+    
+    Tool events arrive on the event loop thread, so one write per event
+    (instead of one print per line) keeps console I/O off the hot path.
+    
+    Args:
+        lines: Lines to write, joined with newlines
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Accepted repository formats: full GitHub URL, or "owner/repo" shorthand
+_GH_URL_RE = re.compile(
+    r'^(?:(?:https?://)?(?:www\.)?github\.com/)?'
+    r'(?P<owner>[^/\s]+)/(?P<repo>[^/\s]+?)(?:\.git)?/?$'
+)
+
+
 def parse_github_url(url: str) -> tuple:
     """
     Parse a GitHub URL to extract owner and repo name.
@@ -74,61 +207,165 @@ def parse_github_url(url: str) -> tuple:
     Returns:
         Tuple of (owner, repo) or (None, None) if invalid
     """
-    patterns = [
-        r'github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$',
-        r'^([^/]+)/([^/]+)$',
-    ]
-    
-    url = url.strip()
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1), match.group(2)
+    match = _GH_URL_RE.match(url.strip())
+    if match:
+        return match['owner'], match['repo']
     
     return None, None
 
 
-def clone_repo(owner: str, repo: str) -> str:
+async def run_git(*args: str) -> subprocess.CompletedProcess:
+    """
+    Run a git command as an asyncio subprocess, without blocking the event loop.
+    
+    Args:
+        *args: Arguments passed to git
+    
+    Returns:
+        CompletedProcess with the exit code and decoded stdout/stderr
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        # Fail fast instead of prompting for credentials (e.g. missing repos)
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    )
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        raise
+    return subprocess.CompletedProcess(
+        ["git", *args], proc.returncode,
+        stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    )
+
+
+async def get_remote_head(clone_url: str) -> str:
     """
-    Clone a GitHub repository to a temp folder.
+    Resolve the remote HEAD commit with a single `git ls-remote` round trip.
+    
+    Args:
+        clone_url: HTTPS clone URL of the repository
+    
+    Returns:
+        The HEAD commit SHA, or None if the remote could not be reached
+    """
+    result = await run_git("ls-remote", clone_url, "HEAD")
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return result.stdout.split()[0]
+
+
+def _analysis_cache_path(owner: str, repo: str, head: str, analysis_type: str) -> str:
+    """Path of the cached result for one analysis of one commit."""
+    # GitHub names are case-insensitive - Foo/Bar and foo/bar share one entry
+    return os.path.join(ANALYSIS_CACHE_DIR, f"{owner}_{repo}_{head}_{analysis_type}.json".lower())
+
+
+def load_cached_analysis(owner: str, repo: str, head: str, analysis_type: str) -> dict:
+    """
+    Load a previously completed analysis of the given commit.
     
     Args:
         owner: Repository owner
         repo: Repository name
+        head: Commit SHA the analysis was run against
+        analysis_type: Type of analysis (overview, structure, dependencies, diagram)
     
     Returns:
-        Path to the cloned repository
+        The cached result dict, or None on a cache miss
     """
-    # Ensure temp_repos directory exists
-    os.makedirs(TEMP_REPOS_DIR, exist_ok=True)
+    path = _analysis_cache_path(owner, repo, head, analysis_type)
+    try:
+        with open(path, "rb") as f:
+            result = orjson.loads(f.read())
+        # Mark as most recently used for LRU pruning
+        os.utime(path)
+        return result
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_analysis(owner: str, repo: str, head: str, analysis_type: str, result: dict):
+    """
+    Store a completed analysis, writing atomically so readers never see a partial file.
     
-    # Create a unique folder for this repo (use short name to avoid path issues on Windows)
-    repo_path = os.path.join(TEMP_REPOS_DIR, f"{repo[:20]}")
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        head: Commit SHA the analysis was run against
+        analysis_type: Type of analysis (overview, structure, dependencies, diagram)
+        result: Result dict returned to the client
+    """
+    os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=ANALYSIS_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(result))
+        os.replace(tmp_path, _analysis_cache_path(owner, repo, head, analysis_type))
+    except OSError as e:
+        print(f"⚠️ Could not cache analysis: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
     
-    # Remove if exists (fresh clone each time)
-    if os.path.exists(repo_path):
-        safe_rmtree(repo_path)
+    # Prune old entries in the background, like clone eviction
+    _cleanup_pool.submit(prune_analysis_cache)
+
+
+def prune_analysis_cache():
+    """Delete the least recently used cached analyses beyond MAX_CACHED_ANALYSES."""
+    entries = []
+    for name in os.listdir(ANALYSIS_CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(ANALYSIS_CACHE_DIR, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
     
-    # Clone the repository
-    clone_url = f"https://github.com/{owner}/{repo}.git"
+    entries.sort(reverse=True)
+    for _, path in entries[MAX_CACHED_ANALYSES:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def clone_repo(clone_url: str, repo_path: str):
+    """
+    Shallow, blobless clone of a GitHub repository into repo_path.
+    
+    Only SPARSE_CHECKOUT_PATHS are written to the working tree; the rest of
+    the tree is still available from git (see list_repo_files, or
+    `git show HEAD:<path>`) and its blobs are fetched on demand from the
+    promisor remote.
+    
+    Args:
+        clone_url: HTTPS clone URL of the repository
+        repo_path: Target folder for the clone
+    """
     print(f"\n{'='*60}")
     print(f"📥 CLONING REPOSITORY: {clone_url}")
     print(f"   Target folder: {repo_path}")
     print(f"{'='*60}\n")
     
-    # Configure git to handle long paths on Windows and do shallow clone
-    result = subprocess.run(
-        [
-            "git", "clone", 
-            "--depth", "1",           # Shallow clone
-            "--single-branch",        # Only clone default branch
-            "--no-tags",              # Skip tags
-            "-c", "core.longpaths=true",  # Handle long paths on Windows
-            clone_url, 
-            repo_path
-        ],
-        capture_output=True,
-        text=True
+    # Configure git to handle long paths on Windows and do a shallow, blobless
+    # partial clone - file contents are only downloaded for checked-out paths
+    result = await run_git(
+        "clone", 
+        "--filter=blob:none",     # Fetch blobs lazily (partial clone)
+        "--depth", "1",           # Shallow clone
+        "--single-branch",        # Only clone default branch
+        "--no-tags",              # Skip tags
+        "--sparse",               # Start with a minimal sparse checkout
+        "--no-checkout",          # Don't write the working tree yet
+        "-c", "core.longpaths=true",  # Handle long paths on Windows
+        clone_url, 
+        repo_path
     )
     
     # Check if at least the directory was created (partial success is ok)
@@ -136,19 +373,229 @@ def clone_repo(owner: str, repo: str) -> str:
         print(f"❌ Clone failed: {result.stderr}")
         raise Exception(f"Failed to clone repository: {result.stderr}")
     
+    # Only check out README/config files and the main source folders - the
+    # working tree is written once, with just the sparse set
+    await run_git("-C", repo_path, "sparse-checkout", "set", "--no-cone", *SPARSE_CHECKOUT_PATHS)
+    checkout = await run_git("-C", repo_path, "checkout")
+    
     # If checkout failed but clone succeeded, try to restore what we can
-    if "checkout failed" in result.stderr.lower():
+    if checkout.returncode != 0:
         print(f"⚠️ Checkout had issues, attempting recovery...")
-        subprocess.run(
-            ["git", "-C", repo_path, "restore", "--source=HEAD", ":/"],
-            capture_output=True,
-            text=True
-        )
+        await run_git("-C", repo_path, "restore", "--source=HEAD", ":/")
     
     print(f"✅ Repository cloned successfully to: {repo_path}\n")
+
+
+async def list_repo_files(repo_path: str) -> tuple:
+    """
+    List every file tracked at HEAD, including paths outside the sparse checkout.
+    
+    The listing comes from `git ls-tree` (trees are present even in a
+    blobless clone) and is cached in memory until the clone's HEAD moves.
+    Only the first MAX_LISTED_FILES paths are kept.
+    
+    Args:
+        repo_path: Path to the cloned repository
+    
+    Returns:
+        Tuple of (first MAX_LISTED_FILES file paths, total number of files)
+    """
+    head = (await run_git("-C", repo_path, "rev-parse", "HEAD")).stdout.strip()
+    cached = _tree_cache.get(repo_path)
+    if cached and cached[0] == head:
+        return cached[1], cached[2]
+    
+    result = await run_git("-C", repo_path, "ls-tree", "-r", "--name-only", head)
+    files = result.stdout.splitlines()
+    _tree_cache[repo_path] = (head, tuple(files[:MAX_LISTED_FILES]), len(files))
+    return _tree_cache[repo_path][1:]
+
+
+async def format_file_listing(repo_path: str) -> str:
+    """
+    Build the prompt section describing files that are not checked out on disk.
+    
+    Args:
+        repo_path: Path to the cloned repository
+    """
+    files, total = await list_repo_files(repo_path)
+    if not files:
+        return ""
+    
+    listing = "\n".join(files)
+    if total > MAX_LISTED_FILES:
+        listing += f"\n... and {total - MAX_LISTED_FILES} more files"
+    
+    return f"""
+
+NOTE: Only README/markdown files, dependency manifests and the src/ and lib/ folders are checked out on disk.
+These are ALL the files tracked in the repository ({total} total). To read a file that is not on disk, run: git -C {repo_path} show HEAD:<path>
+{listing}"""
+
+
+async def update_repo(repo_path: str) -> bool:
+    """
+    Bring an existing shallow clone up to date with the remote HEAD.
+    
+    Args:
+        repo_path: Path to a previously cloned repository
+    
+    Returns:
+        True if the clone was updated, False if it must be re-cloned
+    """
+    print(f"\n{'='*60}")
+    print(f"🔄 UPDATING REPOSITORY: {repo_path}")
+    print(f"{'='*60}\n")
+    
+    fetch = await run_git("-C", repo_path, "fetch", "--depth=1", "--no-tags", "origin", "HEAD")
+    if fetch.returncode != 0:
+        print(f"⚠️ Fetch failed: {fetch.stderr}")
+        return False
+    
+    reset = await run_git("-C", repo_path, "reset", "--hard", "FETCH_HEAD")
+    if reset.returncode != 0:
+        print(f"⚠️ Reset failed: {reset.stderr}")
+        return False
+    
+    print(f"✅ Repository updated: {repo_path}\n")
+    return True
+
+
+async def update_or_clone(owner: str, repo: str) -> str:
+    """
+    Make a local copy of a GitHub repository available in the temp folder.
+    
+    An existing clone is reused and fast-forwarded to the remote HEAD;
+    the repository is only cloned from scratch on first use (or if the
+    existing clone cannot be updated). A clone that another request is
+    still analyzing is never deleted: if it can't be updated it is reused
+    as is. Concurrent requests for the same repo wait for each other
+    instead of updating the folder at once.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
+    
+    Returns:
+        Path to the local repository
+    """
+    # Ensure temp_repos directory exists
+    os.makedirs(TEMP_REPOS_DIR, exist_ok=True)
+    
+    # Create a unique folder for this repo: a short name avoids path issues on
+    # Windows, and a hash of the full name keeps repos sharing a prefix apart
+    # (GitHub names are case-insensitive, so the whole folder name is lowercased:
+    # every spelling maps to one clone and one lock, on any file system)
+    name_hash = hashlib.blake2b(f"{owner}/{repo}".lower().encode(), digest_size=6).hexdigest()
+    repo_path = os.path.join(TEMP_REPOS_DIR, f"{repo[:20].lower()}_{name_hash}")
+    clone_url = f"https://github.com/{owner}/{repo}.git"
+    
+    # Mark the clone in use before touching it, so it can't be evicted mid-update
+    acquire_repo(repo_path)
+    try:
+        async with _repo_locks.setdefault(repo_path, asyncio.Lock()):
+            if not os.path.exists(os.path.join(repo_path, ".git")):
+                # First use, or a broken folder - start over with a fresh clone
+                await asyncio.to_thread(safe_rmtree, repo_path)
+                await clone_repo(clone_url, repo_path)
+            elif not await update_repo(repo_path):
+                if shared_repo(repo_path):
+                    # Another request is analyzing this clone - keep using the
+                    # stale copy rather than deleting it from under that request
+                    print(f"⚠️ Reusing stale clone (in use by another request): {repo_path}\n")
+                else:
+                    await asyncio.to_thread(safe_rmtree, repo_path)
+                    await clone_repo(clone_url, repo_path)
+            
+            # Mark as most recently used for LRU eviction
+            os.utime(repo_path)
+    except BaseException:
+        release_repo(repo_path)
+        raise
     return repo_path
 
 
+def acquire_repo(repo_path: str):
+    """
+    Mark a clone as in use so evict_stale_repos leaves it alone.
+    
+    Args:
+        repo_path: Path to the cloned repository
+    """
+    with _repo_state_lock:
+        _repos_in_use[repo_path] += 1
+
+
+def release_repo(repo_path: str):
+    """
+    Drop one use of a clone acquired with acquire_repo.
+    
+    Args:
+        repo_path: Path to the cloned repository
+    """
+    with _repo_state_lock:
+        _repos_in_use[repo_path] -= 1
+        if _repos_in_use[repo_path] <= 0:
+            del _repos_in_use[repo_path]
+
+
+def shared_repo(repo_path: str) -> bool:
+    """
+    Check whether a clone acquired by the caller is also in use by another request.
+    
+    Args:
+        repo_path: Path to the cloned repository
+    """
+    with _repo_state_lock:
+        return _repos_in_use[repo_path] > 1
+
+
+def evict_stale_repos():
+    """
+    Remove the least recently used clones once the cache exceeds MAX_CACHED_REPOS.
+    
+    Clones that a request is currently updating or analyzing are never
+    evicted. A victim is renamed out of the way while holding the in-use
+    lock, so a request can't start using it before it is deleted; the slow
+    delete then happens without the lock. The in-memory lock and listing of
+    every clone that no longer exists are dropped as well.
+    """
+    entries = []
+    for name in os.listdir(TEMP_REPOS_DIR):
+        path = os.path.join(TEMP_REPOS_DIR, name)
+        if name.startswith(EVICTED_PREFIX):
+            # Leftover from an earlier eviction that couldn't be deleted
+            cleanup_repo(path)
+            continue
+        try:
+            if os.path.isdir(path):
+                entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    
+    entries.sort(reverse=True)
+    for _, path in entries[MAX_CACHED_REPOS:]:
+        evicted_path = os.path.join(TEMP_REPOS_DIR, f"{EVICTED_PREFIX}{os.path.basename(path)}_{time.time_ns()}")
+        with _repo_state_lock:
+            if _repos_in_use[path]:
+                continue
+            try:
+                os.rename(path, evicted_path)
+            except OSError as e:
+                print(f"⚠️ Could not evict {path}: {e}")
+                continue
+        cleanup_repo(evicted_path)
+    
+    # Forget locks and listings of clones that are gone (evicted above, or a
+    # clone that failed). A lock is only held by a request that has acquired
+    # the clone, so unused entries can be dropped safely.
+    with _repo_state_lock:
+        for path in set(_repo_locks) | set(_tree_cache):
+            if not _repos_in_use[path] and not os.path.isdir(path):
+                _repo_locks.pop(path, None)
+                _tree_cache.pop(path, None)
+
+
 def cleanup_repo(repo_path: str):
     """
     Remove the cloned repository folder.
@@ -156,100 +603,144 @@ def cleanup_repo(repo_path: str):
     Args:
         repo_path: Path to the cloned repository
     """
-    if repo_path and os.path.exists(repo_path):
-        print(f"\n{'='*60}")
-        print(f"🧹 CLEANING UP: {repo_path}")
-        print(f"{'='*60}\n")
-        safe_rmtree(repo_path)
+    print(f"\n{'='*60}")
+    print(f"🧹 CLEANING UP: {repo_path}")
+    print(f"{'='*60}\n")
+    if safe_rmtree(repo_path):
         print(f"✅ Cleanup complete\n")
 
 
-async def analyze_github_repo(repo_url: str, analysis_type: str = "overview") -> dict:
+async def _create_session():
     """
-    Analyze a GitHub repository using the Copilot SDK.
+    Open a Copilot session on the shared client.
     
-    Args:
-        repo_url: The GitHub repository URL
-        analysis_type: Type of analysis (overview, structure, dependencies, diagram)
+    Returns:
+        The new session
     """
-    owner, repo = parse_github_url(repo_url)
-    if not owner or not repo:
-        return {
-            "response": "Invalid GitHub URL. Please use format: https://github.com/owner/repo",
-            "events": []
-        }
+    client = await get_client()
+
+    # Create session without MCP servers - use Copilot's built-in capabilities
+    return await client.create_session({"model": "gpt-4.1"})
+
+
+# Repos confirmed to exist (lowercased "owner/repo"), oldest first. Only positive
+# answers are cached - a 404 can turn into a repo later (created, or made public),
+# and a network error or rate limit says nothing either way.
+MAX_KNOWN_REPOS = 256
+_known_repos = {}
+_known_repos_lock = threading.Lock()
+
 
-    # Clone the repository locally
-    repo_path = None
+def repo_exists(owner: str, repo: str) -> bool:
+    """
+    Check that a public GitHub repository exists with a single HEAD request.
+    
+    Only a definite 404 counts as missing; rate limiting or network errors
+    let the analysis go ahead. Confirmed repos are remembered to stay clear
+    of the GitHub API rate limit.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
+    
+    Returns:
+        False if GitHub reports the repository as not found, True otherwise
+    """
+    key = f"{owner}/{repo}".lower()
+    if key in _known_repos:
+        return True
+    
     try:
-        repo_path = clone_repo(owner, repo)
-    except Exception as e:
+        response = requests.head(
+            f"https://api.github.com/repos/{owner}/{repo}",
+            headers={"Accept": "application/vnd.github+json"},
+            timeout=2
+        )
+    except requests.RequestException:
+        return True
+    if response.status_code == 404:
+        return False
+    
+    if response.ok:
+        with _known_repos_lock:
+            _known_repos[key] = True
+            while len(_known_repos) > MAX_KNOWN_REPOS:
+                del _known_repos[next(iter(_known_repos))]
+    return True
+
+
+@dataclass
+class AnalysisContext:
+    """Per-request state shared by the session event handlers."""
+    response_content: list = field(default_factory=list)
+
+
+def _on_message(event, ctx: AnalysisContext):
+    """Collect a complete assistant message for the final response."""
+    ctx.response_content.append(event.data.content)
+
+
+def _on_message_delta(event, ctx: AnalysisContext):
+    """Stream a partial assistant message to the client."""
+    delta = event.data.delta_content or ""
+    if delta:
         return {
-            "response": f"Failed to clone repository: {str(e)}",
-            "events": []
+            "type": "message_delta",
+            "content": delta
         }
 
-    client = CopilotClient()
-    await client.start()
 
-    # Create session without MCP servers - use Copilot's built-in capabilities
-    session = await client.create_session({"model": "gpt-4.1"})
-
-    done = asyncio.Event()
-    response_content = []
-    events_log = []
-
-    def handle_event(event):
-        if event.type.value == "assistant.message":
-            response_content.append(event.data.content)
-        elif event.type.value == "assistant.message_delta":
-            delta = event.data.delta_content or ""
-            if delta:
-                events_log.append({
-                    "type": "message_delta",
-                    "content": delta
-                })
-        elif event.type.value == "tool.execution_start":
-            tool_name = event.data.tool_name
-            tool_call_id = getattr(event.data, 'tool_call_id', None)
-            tool_args = getattr(event.data, 'arguments', None)
-            print(f"\n{'='*60}")
-            print(f"🔧 TOOL CALLED: {tool_name}")
-            print(f"   Call ID: {tool_call_id}")
-            if tool_args:
-                print(f"   Arguments: {tool_args}")
-            print(f"{'='*60}")
-            events_log.append({
-                "type": "tool_start",
-                "tool_name": tool_name,
-                "tool_call_id": tool_call_id
-            })
-        elif event.type.value == "tool.execution_complete":
-            tool_call_id = event.data.tool_call_id
-            result = getattr(event.data, 'result', None)
-            print(f"\n{'='*60}")
-            print(f"✅ TOOL RESULT (Call ID: {tool_call_id})")
-            print(f"-"*60)
-            # Truncate result if too long for readability
-            result_str = str(result) if result else "No result"
-            if len(result_str) > 1000:
-                print(f"{result_str[:1000]}...\n[TRUNCATED - {len(result_str)} chars total]")
-            else:
-                print(result_str)
-            print(f"{'='*60}\n")
-            events_log.append({
-                "type": "tool_complete",
-                "tool_call_id": tool_call_id,
-                "result": result
-            })
-        elif event.type.value == "session.idle":
-            done.set()
-
-    session.on(handle_event)
-
-    # Build analysis prompts based on type - now using LOCAL cloned repo
-    analysis_prompts = {
-        "overview": f"""You are a helpful assistant that analyzes code repositories.
+def _on_tool_start(event, ctx: AnalysisContext):
+    """Log a tool call and stream it to the client."""
+    tool_name = event.data.tool_name
+    tool_call_id = getattr(event.data, 'tool_call_id', None)
+    tool_args = getattr(event.data, 'arguments', None)
+    lines = ["", "="*60, f"🔧 TOOL CALLED: {tool_name}", f"   Call ID: {tool_call_id}"]
+    if tool_args:
+        lines.append(f"   Arguments: {tool_args}")
+    lines.append("="*60)
+    write_block(lines)
+    return {
+        "type": "tool_start",
+        "tool_name": tool_name,
+        "tool_call_id": tool_call_id
+    }
+
+
+def _on_tool_complete(event, ctx: AnalysisContext):
+    """Log a tool result (truncated) and stream it to the client."""
+    tool_call_id = event.data.tool_call_id
+    result = getattr(event.data, 'result', None)
+    # Truncate result if too long for readability
+    result_str = str(result) if result else "No result"
+    if len(result_str) > 1000:
+        result_str = f"{result_str[:1000]}...\n[TRUNCATED - {len(result_str)} chars total]"
+    write_block(["", "="*60, f"✅ TOOL RESULT (Call ID: {tool_call_id})", "-"*60, result_str, "="*60, ""])
+    return {
+        "type": "tool_complete",
+        "tool_call_id": tool_call_id,
+        "result": result
+    }
+
+
+def _ignore_event(event, ctx: AnalysisContext):
+    """Fallback for session events the app doesn't use."""
+    return None
+
+
+# Session event type -> handler returning the client event to stream (or None).
+# Looked up once per event - message deltas arrive by the thousand.
+_EVENT_HANDLERS = {
+    "assistant.message": _on_message,
+    "assistant.message_delta": _on_message_delta,
+    "tool.execution_start": _on_tool_start,
+    "tool.execution_complete": _on_tool_complete,
+}
+
+
+# Analysis prompts by type - filled in per request with str.format(owner=..., repo=..., repo_path=...)
+_PROMPTS = {
+    "overview": """You are a helpful assistant that analyzes code repositories.
 
 I have cloned the GitHub repository {owner}/{repo} to a local folder at: {repo_path}
 
@@ -266,7 +757,7 @@ Provide a comprehensive overview including:
 
 Start by listing the contents of {repo_path} and then read the key files.""",
 
-        "structure": f"""You are a helpful assistant that analyzes code repositories.
+    "structure": """You are a helpful assistant that analyzes code repositories.
 
 I have cloned the GitHub repository {owner}/{repo} to a local folder at: {repo_path}
 
@@ -281,7 +772,7 @@ Use list_dir to explore directories and read_file to examine key files.
 
 Start by listing the contents of {repo_path}""",
 
-        "diagram": f"""You are a helpful assistant that analyzes code repositories and creates Mermaid diagrams.
+    "diagram": """You are a helpful assistant that analyzes code repositories and creates Mermaid diagrams.
 
 I have cloned the GitHub repository {owner}/{repo} to a local folder at: {repo_path}
 
@@ -325,7 +816,7 @@ graph TD
 Keep node labels concise. Use actual component/directory names from {owner}/{repo}.
 Start by listing the contents of {repo_path}""",
 
-        "dependencies": f"""You are a helpful assistant that analyzes code repositories.
+    "dependencies": """You are a helpful assistant that analyzes code repositories.
 
 I have cloned the GitHub repository {owner}/{repo} to a local folder at: {repo_path}
 
@@ -339,25 +830,168 @@ Use read_file to examine dependency files and grep_search to find imports.
 4. Summarize the technology stack
 
 Start by listing the contents of {repo_path} to find dependency files.""",
-    }
+}
+
 
-    prompt = analysis_prompts.get(analysis_type, analysis_prompts["overview"])
+def _succeeded(task: asyncio.Task) -> bool:
+    """Whether a task finished with a result (not cancelled, no exception)."""
+    return task.done() and not task.cancelled() and task.exception() is None
 
+
+async def _prepare_analysis(owner: str, repo: str) -> tuple:
+    """
+    Clone (or update) the repository while the Copilot session starts up.
+    
+    The two are independent, so they run concurrently. If the session can't
+    be created, or startup is cancelled (e.g. the request timed out), any
+    session that was already opened is destroyed, and a clone that was
+    already acquired is released, before the error propagates. On success
+    the caller owns both and must release the clone with release_repo.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
+    
+    Returns:
+        Tuple of (repo path or the exception the clone raised, session)
+    """
+    clone_task = asyncio.ensure_future(update_or_clone(owner, repo))
+    session_task = asyncio.ensure_future(_create_session())
     try:
+        await asyncio.gather(clone_task, session_task, return_exceptions=True)
+        if session_task.exception():
+            raise session_task.exception()
+        clone_result = clone_task.exception() or clone_task.result()
+    except BaseException:
+        # Failed or cancelled mid-startup: let both tasks settle, then release what finished
+        clone_task.cancel()
+        session_task.cancel()
+        await asyncio.wait([clone_task, session_task])
+        if _succeeded(session_task):
+            await session_task.result().destroy()
+        if _succeeded(clone_task):
+            release_repo(clone_task.result())
+        raise
+    return clone_result, session_task.result()
+
+
+async def analyze_github_repo(repo_url: str, analysis_type: str = "overview"):
+    """
+    Analyze a GitHub repository using the Copilot SDK.
+    
+    An async generator: progress events (message deltas, tool calls) are
+    yielded as the session produces them, and the last item is a "result"
+    event with the final response.
+    
+    Args:
+        repo_url: The GitHub repository URL
+        analysis_type: Type of analysis (overview, structure, dependencies, diagram)
+    """
+    owner, repo = parse_github_url(repo_url)
+    if not owner or not repo:
+        yield {
+            "type": "result",
+            "response": "Invalid GitHub URL. Please use format: https://github.com/owner/repo"
+        }
+        return
+    # Reject missing repos in one round trip, before any clone or Copilot session
+    if not await asyncio.to_thread(repo_exists, owner, repo):
+        yield {
+            "type": "result",
+            "response": f"Repository {owner}/{repo} was not found on GitHub.",
+            "owner": owner,
+            "repo": repo
+        }
+        return
+    if analysis_type not in _PROMPTS:
+        analysis_type = "overview"
+
+    # Return a previous analysis of the same commit without cloning or calling Copilot
+    head = await get_remote_head(f"https://github.com/{owner}/{repo}.git")
+    if head:
+        cached = load_cached_analysis(owner, repo, head, analysis_type)
+        if cached:
+            print(f"📦 Using cached {analysis_type} analysis of {owner}/{repo}@{head[:12]}")
+            yield {"type": "result", **cached}
+            return
+
+    clone_result, session = await _prepare_analysis(owner, repo)
+
+    if isinstance(clone_result, BaseException):
+        await session.destroy()
+        yield {
+            "type": "result",
+            "response": f"Failed to clone repository: {str(clone_result)}"
+        }
+        return
+    repo_path = clone_result
+
+    ctx = AnalysisContext()
+    try:
+        # Evict old clones in the background - the response never waits on rmtree
+        _cleanup_pool.submit(evict_stale_repos)
+
+        # Bridge the SDK callback onto the loop; events are consumed below in order
+        loop = asyncio.get_running_loop()
+        session_events = asyncio.Queue()
+        session.on(lambda event: loop.call_soon_threadsafe(session_events.put_nowait, event))
+
+        prompt = _PROMPTS[analysis_type].format(owner=owner, repo=repo, repo_path=repo_path)
+        prompt += await format_file_listing(repo_path)
+
         await session.send({"prompt": prompt})
-        await done.wait()
+        while True:
+            event = await session_events.get()
+            if event.type.value == "session.idle":
+                break
+            item = _EVENT_HANDLERS.get(event.type.value, _ignore_event)(event, ctx)
+            if item:
+                yield item
     finally:
-        await session.destroy()
-        await client.stop()
-        # Clean up the cloned repository
-        cleanup_repo(repo_path)
+        try:
+            await session.destroy()
+        finally:
+            # The clone may be evicted again once no request is using it
+            release_repo(repo_path)
 
-    return {
-        "response": "\n".join(response_content) if response_content else "No response received.",
-        "events": events_log,
+    if not ctx.response_content:
+        yield {
+            "type": "result",
+            "response": "No response received.",
+            "owner": owner,
+            "repo": repo
+        }
+        return
+
+    result = {
+        "response": "\n".join(ctx.response_content),
         "owner": owner,
         "repo": repo
     }
+    if head:
+        save_cached_analysis(owner, repo, head, analysis_type, result)
+    yield {"type": "result", **result}
+
+
+def sse_frame(item: dict) -> bytes:
+    """
+    Encode an event dict as a Server-Sent Events `data:` frame.
+    
+    Unknown types fall back to str() and non-string dict keys (e.g. in tool
+    results) are allowed, matching what the stdlib json module accepted.
+    
+    Args:
+        item: Event dict to send
+    """
+    return b"data: " + orjson.dumps(item, default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
+async def _next_event(stream):
+    """Await the next item of an analysis stream, or None once it is exhausted."""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
 
 
 @app.route('/')
@@ -368,7 +1002,7 @@ def index():
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
-    """Handle the repository analysis request."""
+    """Handle the repository analysis request, streaming progress as Server-Sent Events."""
     data = request.json
     repo_url = data.get('repo_url', '')
     analysis_type = data.get('type', 'overview')
@@ -376,11 +1010,33 @@ def analyze():
     if not repo_url:
         return jsonify({'error': 'Repository URL is required'}), 400
 
-    try:
-        result = asyncio.run(analyze_github_repo(repo_url, analysis_type))
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    stream = analyze_github_repo(repo_url, analysis_type)
+
+    def generate():
+        deadline = time.monotonic() + ANALYSIS_TIMEOUT
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(_next_event(stream), _loop)
+                try:
+                    item = future.result(timeout=max(deadline - time.monotonic(), 0))
+                    if item is None:
+                        break
+                    frame = sse_frame(item)
+                except concurrent.futures.TimeoutError:
+                    future.cancel()
+                    item = {'type': 'error', 'error': f'Analysis timed out after {ANALYSIS_TIMEOUT} seconds'}
+                    frame = sse_frame(item)
+                except Exception as e:
+                    item = {'type': 'error', 'error': str(e)}
+                    frame = sse_frame(item)
+                yield frame
+                if item['type'] == 'error':
+                    break
+        finally:
+            # Finished, timed out or client disconnected - release the session
+            asyncio.run_coroutine_threadsafe(stream.aclose(), _loop)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
 
 
 @app.route('/api/health', methods=['GET'])
@@ -394,7 +1050,10 @@ if __name__ == '__main__':
     print("🔍 Git Repo Visualiser")
     print("=" * 60)
     print("\nAnalyze GitHub repositories and generate flow diagrams")
-    print("Repos are cloned locally to temp_repos/ for analysis")
+    print("Repos are cloned locally to temp_repos/ and reused across requests")
     print("\nStarting server on http://localhost:5002")
     print("=" * 60)
-    app.run(debug=True, port=5002)
+    # Multi-threaded production server: requests run concurrently and share the
+    # module-level event loop and Copilot client (no reloader re-imports)
+    from waitress import serve
+    serve(app, host='127.0.0.1', port=5002, threads=8)
@@ -9,15 +9,115 @@ Run: python app.py
 Then open: http://localhost:5002
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from copilot import CopilotClient
+import orjson
+import requests
 import asyncio
+import atexit
+import concurrent.futures
 import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, which is much faster for large payloads."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+# Maximum time (seconds) a single analysis may take before the request fails
+ANALYSIS_TIMEOUT = 600
+
+# Single event loop shared by all requests, so the Copilot client stays bound to it.
+# It runs forever in a background thread and request threads submit coroutines to it.
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name="asyncio-loop", daemon=True).start()
+
+# Shared Copilot client - started lazily on first use and reused across requests
+_client = CopilotClient()
+_client_started = False
+_client_lock = None
+
+
+def run_async(coro, timeout: float = None):
+    """
+    Run a coroutine on the shared event loop and wait for its result.
+    
+    Safe to call from any request thread; coroutines from concurrent
+    requests run interleaved on the same loop.
+    
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling (None waits forever)
+    
+    Returns:
+        The coroutine's result
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Timed out after {timeout} seconds")
+
+
+async def get_client() -> CopilotClient:
+    """
+    Return the shared Copilot client, starting it on first use.
+    
+    Returns:
+        The started CopilotClient
+    """
+    global _client_started, _client_lock
+    if _client_lock is None:
+        _client_lock = asyncio.Lock()
+    async with _client_lock:
+        if not _client_started:
+            await _client.start()
+            _client_started = True
+    return _client
+
+
+@atexit.register
+def _stop_client():
+    """Stop the shared Copilot client when the app exits."""
+    if _client_started:
+        run_async(_client.stop(), timeout=10)
+
+
+def write_block(lines: list):
+    """
+    Write a multi-line log block to stdout with a single write call.
+    
+    Tool events arrive on the event loop thread, so one write per event
+    (instead of one print per line) keeps console I/O off the hot path.
+    
+    Args:
+        lines: Lines to write, joined with newlines
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Accepted repository formats: full GitHub URL, or "owner/repo" shorthand
+_GH_URL_RE = re.compile(
+    r'^(?:(?:https?://)?(?:www\.)?github\.com/)?'
+    r'(?P<owner>[^/\s]+)/(?P<repo>[^/\s]+?)(?:\.git)?/?$'
+)
+
 
 def parse_github_url(url: str) -> tuple:
     """
@@ -29,96 +129,131 @@ def parse_github_url(url: str) -> tuple:
     Returns:
         Tuple of (owner, repo) or (None, None) if invalid
     """
-    patterns = [
-        r'github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$',
-        r'^([^/]+)/([^/]+)$',
-    ]
-    
-    url = url.strip()
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1), match.group(2)
+    match = _GH_URL_RE.match(url.strip())
+    if match:
+        return match['owner'], match['repo']
     
     return None, None
 
 
-async def analyze_github_repo(repo_url: str, analysis_type: str = "overview") -> dict:
+# Repos confirmed to exist (lowercased "owner/repo"), oldest first. Only positive
+# answers are cached - a 404 can turn into a repo later (created, or made public),
+# and a network error or rate limit says nothing either way.
+MAX_KNOWN_REPOS = 256
+_known_repos = {}
+_known_repos_lock = threading.Lock()
+
+
+def repo_exists(owner: str, repo: str) -> bool:
     """
-    Analyze a GitHub repository using the Copilot SDK.
+    Check that a public GitHub repository exists with a single HEAD request.
+    
+    Only a definite 404 counts as missing; rate limiting or network errors
+    let the analysis go ahead. Confirmed repos are remembered to stay clear
+    of the GitHub API rate limit.
     
     Args:
-        repo_url: The GitHub repository URL
-        analysis_type: Type of analysis (overview, structure, dependencies, diagram)
+        owner: Repository owner
+        repo: Repository name
+    
+    Returns:
+        False if GitHub reports the repository as not found, True otherwise
     """
-    owner, repo = parse_github_url(repo_url)
-    if not owner or not repo:
+    key = f"{owner}/{repo}".lower()
+    if key in _known_repos:
+        return True
+    
+    try:
+        response = requests.head(
+            f"https://api.github.com/repos/{owner}/{repo}",
+            headers={"Accept": "application/vnd.github+json"},
+            timeout=2
+        )
+    except requests.RequestException:
+        return True
+    if response.status_code == 404:
+        return False
+    
+    if response.ok:
+        with _known_repos_lock:
+            _known_repos[key] = True
+            while len(_known_repos) > MAX_KNOWN_REPOS:
+                del _known_repos[next(iter(_known_repos))]
+    return True
+
+
+@dataclass
+class AnalysisContext:
+    """Per-request state shared by the session event handlers."""
+    response_content: list = field(default_factory=list)
+
+
+def _on_message(event, ctx: AnalysisContext):
+    """Collect a complete assistant message for the final response."""
+    ctx.response_content.append(event.data.content)
+
+
+def _on_message_delta(event, ctx: AnalysisContext):
+    """Stream a partial assistant message to the client."""
+    delta = event.data.delta_content or ""
+    if delta:
         return {
-            "response": "Invalid GitHub URL. Please use format: https://github.com/owner/repo",
-            "events": []
+            "type": "message_delta",
+            "content": delta
         }
 
-    client = CopilotClient()
-    await client.start()
 
-    # Create session without MCP servers - use Copilot's built-in capabilities
-    session = await client.create_session({"model": "gpt-4.1"})
+def _on_tool_start(event, ctx: AnalysisContext):
+    """Log a tool call and stream it to the client."""
+    tool_name = event.data.tool_name
+    tool_call_id = getattr(event.data, 'tool_call_id', None)
+    tool_args = getattr(event.data, 'arguments', None)
+    lines = ["", "="*60, f"🔧 TOOL CALLED: {tool_name}", f"   Call ID: {tool_call_id}"]
+    if tool_args:
+        lines.append(f"   Arguments: {tool_args}")
+    lines.append("="*60)
+    write_block(lines)
+    return {
+        "type": "tool_start",
+        "tool_name": tool_name,
+        "tool_call_id": tool_call_id
+    }
+
+
+def _on_tool_complete(event, ctx: AnalysisContext):
+    """Log a tool result (truncated) and stream it to the client."""
+    tool_call_id = event.data.tool_call_id
+    result = getattr(event.data, 'result', None)
+    # Truncate result if too long for readability
+    result_str = str(result) if result else "No result"
+    if len(result_str) > 1000:
+        result_str = f"{result_str[:1000]}...\n[TRUNCATED - {len(result_str)} chars total]"
+    write_block(["", "="*60, f"✅ TOOL RESULT (Call ID: {tool_call_id})", "-"*60, result_str, "="*60, ""])
+    return {
+        "type": "tool_complete",
+        "tool_call_id": tool_call_id,
+        "result": result
+    }
 
-    done = asyncio.Event()
-    response_content = []
-    events_log = []
-
-    def handle_event(event):
-        if event.type.value == "assistant.message":
-            response_content.append(event.data.content)
-        elif event.type.value == "assistant.message_delta":
-            delta = event.data.delta_content or ""
-            if delta:
-                events_log.append({
-                    "type": "message_delta",
-                    "content": delta
-                })
-        elif event.type.value == "tool.execution_start":
-            tool_name = event.data.tool_name
-            tool_call_id = getattr(event.data, 'tool_call_id', None)
-            tool_args = getattr(event.data, 'arguments', None)
-            print(f"\n{'='*60}")
-            print(f"🔧 TOOL CALLED: {tool_name}")
-            print(f"   Call ID: {tool_call_id}")
-            if tool_args:
-                print(f"   Arguments: {tool_args}")
-            print(f"{'='*60}")
-            events_log.append({
-                "type": "tool_start",
-                "tool_name": tool_name,
-                "tool_call_id": tool_call_id
-            })
-        elif event.type.value == "tool.execution_complete":
-            tool_call_id = event.data.tool_call_id
-            result = getattr(event.data, 'result', None)
-            print(f"\n{'='*60}")
-            print(f"✅ TOOL RESULT (Call ID: {tool_call_id})")
-            print(f"-"*60)
-            # Truncate result if too long for readability
-            result_str = str(result) if result else "No result"
-            if len(result_str) > 1000:
-                print(f"{result_str[:1000]}...\n[TRUNCATED - {len(result_str)} chars total]")
-            else:
-                print(result_str)
-            print(f"{'='*60}\n")
-            events_log.append({
-                "type": "tool_complete",
-                "tool_call_id": tool_call_id,
-                "result": result
-            })
-        elif event.type.value == "session.idle":
-            done.set()
-
-    session.on(handle_event)
-
-    # Build analysis prompts based on type
-    analysis_prompts = {
-        "overview": f"""You are a helpful assistant that analyzes GitHub repositories.
+
+def _ignore_event(event, ctx: AnalysisContext):
+    """Fallback for session events the app doesn't use."""
+    return None
+
+
+# Session event type -> handler returning the client event to stream (or None).
+# Looked up once per event - message deltas arrive by the thousand.
+_EVENT_HANDLERS = {
+    "assistant.message": _on_message,
+    "assistant.message_delta": _on_message_delta,
+    "tool.execution_start": _on_tool_start,
+    "tool.execution_complete": _on_tool_complete,
+}
+
+
+# Analysis prompts by type - filled in per request with str.format(owner=..., repo=...)
+_PROMPTS = {
+    "overview": """You are a helpful assistant that analyzes GitHub repositories.
 
 Please analyze the GitHub repository: https://github.com/{owner}/{repo}
 
@@ -131,7 +266,7 @@ Provide a comprehensive overview including:
 
 Fetch and analyze the repository information to provide accurate details.""",
 
-        "structure": f"""You are a helpful assistant that analyzes GitHub repositories.
+    "structure": """You are a helpful assistant that analyzes GitHub repositories.
 
 Please analyze the file structure of: https://github.com/{owner}/{repo}
 
@@ -142,7 +277,7 @@ Please analyze the file structure of: https://github.com/{owner}/{repo}
 
 Browse the repository to understand its structure.""",
 
-        "diagram": f"""You are a helpful assistant that analyzes GitHub repositories and creates Mermaid diagrams.
+    "diagram": """You are a helpful assistant that analyzes GitHub repositories and creates Mermaid diagrams.
 
 IMPORTANT: Do NOT analyze any local files or the current working directory.
 ONLY analyze the remote GitHub repository at this URL: https://github.com/{owner}/{repo}
@@ -166,7 +301,7 @@ graph TD
 Use actual component names, directories, or module names from the {owner}/{repo} repository.
 Do NOT reference any local files - only use information from the GitHub repository.""",
 
-        "dependencies": f"""You are a helpful assistant that analyzes GitHub repositories.
+    "dependencies": """You are a helpful assistant that analyzes GitHub repositories.
 
 Please analyze the dependencies of: https://github.com/{owner}/{repo}
 
@@ -176,23 +311,92 @@ Please analyze the dependencies of: https://github.com/{owner}/{repo}
 4. Summarize the technology stack
 
 Fetch the dependency information from the repository.""",
-    }
+}
+
+
+async def analyze_github_repo(repo_url: str, analysis_type: str = "overview"):
+    """
+    Analyze a GitHub repository using the Copilot SDK.
+    
+    An async generator: progress events (message deltas, tool calls) are
+    yielded as the session produces them, and the last item is a "result"
+    event with the final response.
+    
+    Args:
+        repo_url: The GitHub repository URL
+        analysis_type: Type of analysis (overview, structure, dependencies, diagram)
+    """
+    owner, repo = parse_github_url(repo_url)
+    if not owner or not repo:
+        yield {
+            "type": "result",
+            "response": "Invalid GitHub URL. Please use format: https://github.com/owner/repo"
+        }
+        return
+    # Reject missing repos in one round trip, before any clone or Copilot session
+    if not await asyncio.to_thread(repo_exists, owner, repo):
+        yield {
+            "type": "result",
+            "response": f"Repository {owner}/{repo} was not found on GitHub.",
+            "owner": owner,
+            "repo": repo
+        }
+        return
+
+    client = await get_client()
+
+    # Create session without MCP servers - use Copilot's built-in capabilities
+    session = await client.create_session({"model": "gpt-4.1"})
 
-    prompt = analysis_prompts.get(analysis_type, analysis_prompts["overview"])
+    # Bridge the SDK callback onto the loop; events are consumed below in order
+    loop = asyncio.get_running_loop()
+    session_events = asyncio.Queue()
+    session.on(lambda event: loop.call_soon_threadsafe(session_events.put_nowait, event))
 
-    await session.send({"prompt": prompt})
-    await done.wait()
-    await session.destroy()
-    await client.stop()
+    ctx = AnalysisContext()
+    prompt = _PROMPTS.get(analysis_type, _PROMPTS["overview"]).format(owner=owner, repo=repo)
 
-    return {
-        "response": "\n".join(response_content) if response_content else "No response received.",
-        "events": events_log,
+    try:
+        await session.send({"prompt": prompt})
+        while True:
+            event = await session_events.get()
+            if event.type.value == "session.idle":
+                break
+            item = _EVENT_HANDLERS.get(event.type.value, _ignore_event)(event, ctx)
+            if item:
+                yield item
+    finally:
+        await session.destroy()
+
+    yield {
+        "type": "result",
+        "response": "\n".join(ctx.response_content) if ctx.response_content else "No response received.",
         "owner": owner,
         "repo": repo
     }
 
 
+def sse_frame(item: dict) -> bytes:
+    """
+    Encode an event dict as a Server-Sent Events `data:` frame.
+    
+    Unknown types fall back to str() and non-string dict keys (e.g. in tool
+    results) are allowed, matching what the stdlib json module accepted.
+    
+    Args:
+        item: Event dict to send
+    """
+    return b"data: " + orjson.dumps(item, default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
+async def _next_event(stream):
+    """Await the next item of an analysis stream, or None once it is exhausted."""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
 @app.route('/')
 def index():
     """Serve the main HTML page."""
@@ -201,7 +405,7 @@ def index():
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
-    """Handle the repository analysis request."""
+    """Handle the repository analysis request, streaming progress as Server-Sent Events."""
     data = request.json
     repo_url = data.get('repo_url', '')
     analysis_type = data.get('type', 'overview')
@@ -209,11 +413,33 @@ def analyze():
     if not repo_url:
         return jsonify({'error': 'Repository URL is required'}), 400
 
-    try:
-        result = asyncio.run(analyze_github_repo(repo_url, analysis_type))
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    stream = analyze_github_repo(repo_url, analysis_type)
+
+    def generate():
+        deadline = time.monotonic() + ANALYSIS_TIMEOUT
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(_next_event(stream), _loop)
+                try:
+                    item = future.result(timeout=max(deadline - time.monotonic(), 0))
+                    if item is None:
+                        break
+                    frame = sse_frame(item)
+                except concurrent.futures.TimeoutError:
+                    future.cancel()
+                    item = {'type': 'error', 'error': f'Analysis timed out after {ANALYSIS_TIMEOUT} seconds'}
+                    frame = sse_frame(item)
+                except Exception as e:
+                    item = {'type': 'error', 'error': str(e)}
+                    frame = sse_frame(item)
+                yield frame
+                if item['type'] == 'error':
+                    break
+        finally:
+            # Finished, timed out or client disconnected - release the session
+            asyncio.run_coroutine_threadsafe(stream.aclose(), _loop)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
 
 
 @app.route('/api/health', methods=['GET'])
@@ -230,4 +456,7 @@ if __name__ == '__main__':
     print("Using GitHub MCP Server for repository access")
     print("\nStarting server on http://localhost:5002")
     print("=" * 60)
-    app.run(debug=True, port=5002)
+    # Multi-threaded production server: requests run concurrently and share the
+    # module-level event loop and Copilot client (no reloader re-imports)
+    from waitress import serve
+    serve(app, host='127.0.0.1', port=5002, threads=8)